@@ -1,7 +1,7 @@
 """Analysis package for DFIR Case Automation Bot.
 
 This package contains modular analysis components used by the bot:
-- hashing: Compute MD5/SHA1/SHA256 for files
+- hashing: Compute SHA256 (optionally MD5/SHA1) for files
 - metadata: Extract metadata from images, PDFs, and DOCX files
 - logs: Parse common log formats to produce event records
 - browser: Parse browser history databases (Chrome/Edge and Firefox)
@@ -9,20 +9,24 @@ This package contains modular analysis components used by the bot:
 
 Each module exposes a main function that accepts a pathlib.Path pointing to
 the case evidence directory and returns structured results for downstream
-processing.
+processing. walk_case() lists the case files once; passing its result as
+'files' lets every stage share a single directory traversal.
 
 Importing functions here provides a clean, single import surface for bot.py
 (e.g., `from analysis import compute_hashes_for_case`).
 """
 
-from .hashing import compute_hashes_for_case  # file hashing across the case directory
+from ._walk import walk_case  # single shared traversal of the case directory
+from .hashing import compute_hashes_for_case, validate_hash_algorithms  # file hashing across the case directory
 from .metadata import extract_metadata_for_case  # image/PDF/DOCX metadata extraction
 from .logs import parse_logs_for_case  # auth.log and access.log events
 from .browser import parse_browser_history  # Chrome/Edge and Firefox history events
 from .timeline import build_timeline, write_report  # sort events and write Markdown report
 
 __all__ = [
+    "walk_case",
     "compute_hashes_for_case",
+    "validate_hash_algorithms",
     "extract_metadata_for_case",
     "parse_logs_for_case",
     "parse_browser_history",
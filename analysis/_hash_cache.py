@@ -0,0 +1,133 @@
+"""Persistent cache of file digests keyed by file identity.
+
+Evidence is often re-analyzed (e.g., /analyze after every upload). Files whose
+identity key is unchanged since they were last hashed are served from this
+cache instead of being read again.
+
+The key is (st_dev, st_ino, st_size, st_mtime_ns, st_ctime_ns). mtime alone can
+be set back by tools like 'touch'; ctime cannot be set from userspace and
+changes on every write or metadata change, so any modification invalidates
+the entry.
+
+Entries of files that are never seen again (e.g., deleted cases) are pruned:
+each entry records when it was last used, and the least recently used rows
+are deleted once the table exceeds its size limit. The cache is disposable;
+callers treat any sqlite3.Error from it as "no cache".
+"""
+
+from pathlib import Path  # Location of the cache database
+from typing import Dict, Iterable, Optional, Sequence, Tuple  # Cache key/value typing
+import sqlite3  # Built-in, file-based storage for the cache
+import time  # Last-used timestamps for pruning
+
+from ._walk import CaseFile  # Walk records carry the stat() fields used as key
+
+FileKey = Tuple[int, int, int, int, int]
+
+# Bumped whenever the table layout changes; an older table is dropped and
+# rebuilt, which only costs re-hashing
+_SCHEMA_VERSION = 2
+
+# Upper bound on cached (file, algorithm) rows, roughly 150MB on disk
+DEFAULT_MAX_ROWS = 1_000_000
+
+
+def file_key(f: CaseFile) -> Optional[FileKey]:
+    """Return the identity key for a walked file, or None if it has no inode.
+
+    Some platforms/filesystems report st_ino == 0; such files are never cached.
+    """
+    if not f.st_ino:
+        return None
+    return (f.st_dev, f.st_ino, f.st_size, f.st_mtime_ns, f.st_ctime_ns)
+
+
+class HashCache:
+    """SQLite-backed mapping of FileKey -> {algorithm: hex digest}.
+
+    One row is stored per (key, algorithm), so runs with different
+    HASH_ALGORITHMS settings can share the cache. Use as a context manager.
+    Every method may raise sqlite3.Error (e.g., a corrupt file or a lock that
+    outlives the timeout).
+    """
+
+    def __init__(self, db_path: Path, max_rows: int = DEFAULT_MAX_ROWS) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_rows = max_rows
+        # WAL + busy timeout let concurrent analyses read and write safely
+        self._conn = sqlite3.connect(str(db_path), timeout=30)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                    self._conn.execute("DROP TABLE IF EXISTS file_hashes")
+                    self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS file_hashes ("
+                    " dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, ctime_ns INTEGER,"
+                    " algorithm TEXT, digest TEXT, last_used INTEGER,"
+                    " PRIMARY KEY (dev, ino, size, mtime_ns, ctime_ns, algorithm))"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS file_hashes_last_used ON file_hashes (last_used)"
+                )
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get(self, key: FileKey, algorithms: Sequence[str]) -> Optional[Dict[str, str]]:
+        """Return cached digests for key, or None unless every algorithm is cached."""
+        rows = self._conn.execute(
+            "SELECT algorithm, digest FROM file_hashes"
+            " WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ? AND ctime_ns = ?",
+            key,
+        ).fetchall()
+        cached = dict(rows)
+        if not all(name in cached for name in algorithms):
+            return None
+        return {name: cached[name] for name in algorithms}
+
+    def update(
+        self,
+        hits: Iterable[FileKey],
+        entries: Iterable[Tuple[FileKey, Dict[str, str]]],
+    ) -> None:
+        """Record one run in a single transaction, then prune old rows.
+
+        'hits' are keys served from the cache (their rows are marked as used
+        now); 'entries' are newly computed digests to store.
+        """
+        now = int(time.time())
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE file_hashes SET last_used = ?"
+                " WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ? AND ctime_ns = ?",
+                ((now, *key) for key in hits),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (*key, name, digest, now)
+                    for key, digests in entries
+                    for name, digest in digests.items()
+                ),
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0] - self._max_rows
+            if excess > 0:
+                # Least recently used first: files of deleted cases stop being
+                # touched and age out
+                self._conn.execute(
+                    "DELETE FROM file_hashes WHERE rowid IN"
+                    " (SELECT rowid FROM file_hashes ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
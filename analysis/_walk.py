@@ -0,0 +1,81 @@
+"""Single-pass traversal of a case evidence directory.
+
+Hashing, metadata extraction, log parsing, and browser parsing all need the
+list of files in a case. Walking the tree once with os.scandir and sharing the
+result avoids repeating the directory scan and the per-entry stat() calls for
+every analysis stage.
+"""
+
+from pathlib import Path  # File system paths
+from typing import List, NamedTuple  # Lightweight file records
+import os  # os.scandir exposes cached directory entry information
+import stat  # Regular-file check on the cached stat() result
+
+
+class CaseFile(NamedTuple):
+    """A regular file found in the case directory.
+
+    'suffix' is lower-cased for extension matching; 'name' keeps its original
+    case because some artifacts (e.g., Chrome's 'History') are matched exactly.
+    'rel' is the path relative to the case directory, built from the walk
+    itself so consumers never need Path.relative_to(). The device/inode and
+    timestamps identify file content across runs (see the hash cache).
+    """
+
+    path: Path
+    rel: str
+    name: str
+    suffix: str
+    st_mode: int
+    st_size: int
+    st_dev: int
+    st_ino: int
+    st_mtime_ns: int
+    st_ctime_ns: int
+
+
+def walk_case(case_path: Path) -> List[CaseFile]:
+    """Recursively list regular files under case_path with their stat() info.
+
+    Symlinked directories are not descended into; symlinks to files are
+    included (like Path.rglob + is_file). Unreadable directories and entries
+    that vanish during the walk are skipped.
+    """
+    files: List[CaseFile] = []
+    # (absolute directory, directory relative to case_path) still to scan
+    pending = [(str(case_path), "")]
+    while pending:
+        dir_path, rel_dir = pending.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, rel))
+                    continue
+                st = entry.stat()  # follows symlinks, cached on the entry
+            except OSError:
+                # Broken symlinks and vanished files are skipped
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            path = Path(entry.path)
+            files.append(
+                CaseFile(
+                    path,
+                    rel,
+                    entry.name,
+                    path.suffix.lower(),
+                    st.st_mode,
+                    st.st_size,
+                    st.st_dev,
+                    st.st_ino,
+                    st.st_mtime_ns,
+                    st.st_ctime_ns,
+                )
+            )
+    return files
@@ -1,28 +1,98 @@
 from pathlib import Path  # File system paths
-from typing import Any, Dict, List  # Event typing for browser visits
+from typing import Any, Dict, Iterator, List, Optional  # Event typing for browser visits
+import logging  # Report WAL files that could not be read
+import shutil  # Copy a database and its WAL out of the evidence folder
 import sqlite3  # Built-in SQLite client for history databases
-from datetime import datetime, timedelta  # Timestamp conversions
+import tempfile  # Scratch directory for those copies
+from contextlib import closing, contextmanager  # Always close SQLite connections
 
+from ._walk import CaseFile, walk_case  # Shared single-pass case traversal
 
-def _chrome_time_to_datetime(value: int | float) -> datetime | None:
-    """Convert Chrome/Edge 'last_visit_time' to a datetime.
+logger = logging.getLogger(__name__)
 
-    Chrome stores timestamps as microseconds since January 1, 1601 UTC.
+
+def _iso_sql(us_expr: str) -> str:
+    """Return a SQL expression rendering microseconds since the Unix epoch as ISO 8601.
+
+    The conversion runs inside SQLite instead of building a datetime per row in
+    Python. The output matches datetime.isoformat(): whole seconds, plus a
+    '.ffffff' fraction only when there is one. NULL input yields NULL.
+
+    SQLite's integer '/' and '%' truncate toward zero, so the fraction is
+    normalized to 0..999999 and subtracted first; the division is then exact
+    and pre-1970 values round down like Python's timedelta arithmetic.
     """
-    try:
-        epoch = datetime(1601, 1, 1)
-        return epoch + timedelta(microseconds=int(value))
-    except Exception:
-        return None
+    frac = f"((({us_expr}) % 1000000 + 1000000) % 1000000)"
+    return (
+        f"strftime('%Y-%m-%dT%H:%M:%S', (({us_expr}) - {frac}) / 1000000, 'unixepoch')"
+        f" || CASE WHEN {frac} > 0"
+        f" THEN printf('.%06d', {frac}) ELSE '' END"
+    )
+
+
+# Chrome/Edge store 'last_visit_time' as microseconds since January 1, 1601 UTC;
+# 11644473600 seconds separate that epoch from the Unix epoch.
+_CHROME_HISTORY_SQL = (
+    "SELECT url, title, "
+    + _iso_sql("last_visit_time - 11644473600000000")
+    + ", last_visit_time FROM urls ORDER BY last_visit_time DESC LIMIT ?"
+)
+
+# Firefox stores 'last_visit_date' as microseconds since the Unix epoch
+_FIREFOX_PLACES_SQL = (
+    "SELECT url, title, "
+    + _iso_sql("last_visit_date")
+    + ", last_visit_date FROM moz_places ORDER BY last_visit_date DESC LIMIT ?"
+)
+
+
+def _open_uri(uri: str) -> sqlite3.Connection:
+    """Connect to a database URI for queries only."""
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute("PRAGMA query_only = 1")
+    # Let the pager read pages through mmap (up to 256MB) instead of read()
+    conn.execute("PRAGMA mmap_size = 268435456")
+    return conn
 
 
-def _firefox_time_to_datetime(value: int | float) -> datetime | None:
-    """Convert Firefox 'last_visit_date' (microseconds since Unix epoch) to datetime."""
+@contextmanager
+def _connect_readonly(path: Path) -> Iterator[sqlite3.Connection]:
+    """Open an evidence SQLite database strictly read-only, closing it on exit.
+
+    A plain connect() opens the file read-write: SQLite may create -journal or
+    -wal files next to the evidence and checkpoint into it, altering the
+    artifact. 'mode=ro&immutable=1' forbids writes and also skips locking and
+    change detection, which makes reads cheaper.
+
+    An immutable database is read without its -wal file, yet browsers run in
+    WAL mode and the newest visits often exist only there. When a non-empty
+    -wal file was uploaded next to the database, both are copied to a
+    temporary directory and the copy is opened with 'mode=ro', which applies
+    the WAL; the evidence itself is never opened. If the copy fails, the
+    database is read without its WAL and a warning says so.
+    """
+    wal = path.with_name(path.name + "-wal")
     try:
-        epoch = datetime(1970, 1, 1)
-        return epoch + timedelta(microseconds=int(value))
-    except Exception:
-        return None
+        has_wal = wal.stat().st_size > 0
+    except OSError:
+        has_wal = False
+
+    if has_wal:
+        tmp = tempfile.TemporaryDirectory(prefix="browser-")
+        copy = Path(tmp.name) / path.name
+        try:
+            shutil.copyfile(path, copy)
+            shutil.copyfile(wal, copy.with_name(copy.name + "-wal"))
+        except OSError as e:
+            tmp.cleanup()
+            logger.warning("Could not copy %s with its WAL (%s); reading it without the WAL", path, e)
+        else:
+            with tmp, closing(_open_uri(copy.as_uri() + "?mode=ro")) as conn:
+                yield conn
+            return
+
+    with closing(_open_uri(path.resolve().as_uri() + "?mode=ro&immutable=1")) as conn:
+        yield conn
 
 
 def _parse_chrome_history(path: Path, limit: int = 200) -> List[Dict[str, Any]]:
@@ -31,34 +101,27 @@ def _parse_chrome_history(path: Path, limit: int = 200) -> List[Dict[str, Any]]:
     The 'urls' table stores URL, title, and last_visit_time used here.
     """
     events: List[Dict[str, Any]] = []
+    source = str(path)
     try:
-        conn = sqlite3.connect(str(path))
-        cur = conn.cursor()
-        # Basic query from 'urls' table; avoiding joins for simplicity
-        cur.execute(
-            "SELECT url, title, last_visit_time FROM urls ORDER BY last_visit_time DESC LIMIT ?",
-            (limit,),
-        )
-        rows = cur.fetchall()
-        for url, title, last_visit_time in rows:
-            dt = _chrome_time_to_datetime(last_visit_time)
-            events.append(
-                {
-                    "timestamp": dt.isoformat() if dt else str(last_visit_time),
-                    "timestamp_raw": last_visit_time,
-                    "type": "browser_visit",
-                    "url": url,
-                    "title": title or "",
-                    "source": str(path),
-                }
-            )
+        with _connect_readonly(path) as conn:
+            # Basic query from 'urls' table; avoiding joins for simplicity.
+            # Iterating the cursor streams rows instead of materializing them
+            # with fetchall(), so a raised limit does not double memory use.
+            rows = conn.execute(_CHROME_HISTORY_SQL, (limit,))
+            append = events.append
+            for url, title, iso, last_visit_time in rows:
+                append(
+                    {
+                        "timestamp": iso if iso is not None else str(last_visit_time),
+                        "timestamp_raw": last_visit_time,
+                        "type": "browser_visit",
+                        "url": url,
+                        "title": title or "",
+                        "source": source,
+                    }
+                )
     except Exception:
         return events
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
     return events
 
 
@@ -68,48 +131,41 @@ def _parse_firefox_places(path: Path, limit: int = 200) -> List[Dict[str, Any]]:
     The 'moz_places' table stores URL, title, and last_visit_date used here.
     """
     events: List[Dict[str, Any]] = []
+    source = str(path)
     try:
-        conn = sqlite3.connect(str(path))
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT url, title, last_visit_date FROM moz_places ORDER BY last_visit_date DESC LIMIT ?",
-            (limit,),
-        )
-        rows = cur.fetchall()
-        for url, title, last_visit_date in rows:
-            dt = _firefox_time_to_datetime(last_visit_date)
-            events.append(
-                {
-                    "timestamp": dt.isoformat() if dt else str(last_visit_date),
-                    "timestamp_raw": last_visit_date,
-                    "type": "browser_visit",
-                    "url": url,
-                    "title": title or "",
-                    "source": str(path),
-                }
-            )
+        with _connect_readonly(path) as conn:
+            rows = conn.execute(_FIREFOX_PLACES_SQL, (limit,))
+            append = events.append
+            for url, title, iso, last_visit_date in rows:
+                append(
+                    {
+                        "timestamp": iso if iso is not None else str(last_visit_date),
+                        "timestamp_raw": last_visit_date,
+                        "type": "browser_visit",
+                        "url": url,
+                        "title": title or "",
+                        "source": source,
+                    }
+                )
     except Exception:
         return events
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
     return events
 
 
-def parse_browser_history(case_path: Path) -> List[Dict[str, Any]]:
+def parse_browser_history(case_path: Path, files: Optional[List[CaseFile]] = None) -> List[Dict[str, Any]]:
     """Locate Chrome/Edge ('History') and Firefox ('places.sqlite') databases and parse them.
 
     Browsing activity can contextualize events (e.g., user visited phishing site).
+    'files' is the shared result of walk_case(); the directory is walked here
+    only when it is not provided.
     """
+    if files is None:
+        files = walk_case(case_path)
     events: List[Dict[str, Any]] = []
-    for path in case_path.rglob("*"):
-        if not path.is_file():
-            continue
-        name = path.name
+    for f in files:
+        name = f.name
         if name == "History":
-            events.extend(_parse_chrome_history(path))
+            events.extend(_parse_chrome_history(f.path))
         elif name == "places.sqlite":
-            events.extend(_parse_firefox_places(path))
+            events.extend(_parse_firefox_places(f.path))
     return events
\ No newline at end of file
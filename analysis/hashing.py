@@ -1,54 +1,269 @@
 from pathlib import Path  # Path objects provide convenient, cross-platform file handling
-from typing import Dict, List  # Type hints for clarity
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple  # Type hints for clarity
+from concurrent.futures import ThreadPoolExecutor  # Hash several files at once
 import hashlib  # Standard library hashing algorithms (MD5/SHA1/SHA256)
+import logging  # Report (but survive) hash cache failures
+import mmap  # Map large files so hashlib reads page-cache memory directly
+import os  # CPU count for sizing the worker pool
+import sqlite3  # Hash cache errors are caught and the cache skipped
 
+from ._walk import CaseFile, walk_case  # Shared single-pass case traversal
+from ._hash_cache import FileKey, HashCache, file_key  # Skip re-hashing unchanged files
 
-def _hash_file(path: Path) -> Dict[str, str]:
-    """Compute MD5, SHA1, and SHA256 hashes for a single file.
+logger = logging.getLogger(__name__)
 
-    Streaming in chunks protects memory usage with large evidence files and
-    is a common DFIR practice for integrity verification.
+# SHA256 alone is the default: OpenSSL dispatches it to the CPU's SHA
+# extensions where available, while MD5/SHA1 would each add a full extra pass
+# over the data. Investigators who need legacy digests (e.g., to match older
+# hash sets) can opt in by passing ("md5", "sha1", "sha256").
+DEFAULT_HASH_ALGORITHMS = ("sha256",)
+
+# Cases often contain thousands of small files (logs, browser profiles). Files
+# below this size are read with a single call and digested in one shot, and are
+# grouped into batches so each worker task amortizes scheduling overhead.
+_SMALL_FILE_SIZE = 1024 * 1024
+_SMALL_FILE_BATCH = 16
+
+# Large files are mapped into memory and fed to hashlib in 16MB slices
+_MMAP_SLICE = 16 * 1024 * 1024
+
+
+def validate_hash_algorithms(names: Sequence[str]) -> Tuple[str, ...]:
+    """Normalize and check hash algorithm names, raising ValueError on bad ones.
+
+    Every name must be a hashlib algorithm with a fixed-length digest.
+    Extendable-output functions (shake_128/shake_256) need an explicit length
+    for hexdigest(); they would fail on every file and leave the hash table
+    silently empty, so they are rejected here.
+    """
+    algorithms = tuple(name.strip().lower() for name in names if name.strip())
+    if not algorithms:
+        raise ValueError("No hash algorithm given")
+    for name in algorithms:
+        if name not in hashlib.algorithms_available:
+            raise ValueError(f"Unsupported hash algorithm: {name}")
+        try:
+            hashlib.new(name).hexdigest()
+        except TypeError:
+            raise ValueError(f"Unsupported hash algorithm (variable-length digest): {name}") from None
+    return algorithms
+
+
+def _update_streaming(f: BinaryIO, hashers: List[Any]) -> None:
+    """Feed a file to every hasher through a reusable read buffer."""
+    # Use a 4MB buffer: fewer Python-level iterations per file while still
+    # bounding memory usage. hashlib releases the GIL for large updates.
+    buf = bytearray(4 * 1024 * 1024)
+    view = memoryview(buf)
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            break
+        chunk = view[:n]
+        for h in hashers:
+            h.update(chunk)
+
+
+def _update_from_file(f: BinaryIO, hashers: List[Any]) -> None:
+    """Feed a whole file to every hasher, preferring a read-only memory map.
+
+    Mapping the file lets hashlib consume page-cache memory directly: there is
+    no read() syscall or bytes allocation per chunk, and OpenSSL processes each
+    large slice without returning to Python in between.
+    """
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Some files (e.g., on special filesystems) cannot be mapped
+        _update_streaming(f, hashers)
+        return
+    # Slices must be released before the map can be closed
+    with mm, memoryview(mm) as view:
+        for offset in range(0, len(view), _MMAP_SLICE):
+            with view[offset:offset + _MMAP_SLICE] as chunk:
+                for h in hashers:
+                    h.update(chunk)
+
+
+def _hash_file(path: Path, algorithms: Sequence[str] = DEFAULT_HASH_ALGORITHMS) -> Dict[str, str]:
+    """Compute the requested hashes (SHA256 by default) for a single file.
+
+    Large files are memory-mapped and the same bytes are fed to every requested
+    digest in a single pass. This protects memory usage with large evidence
+    files (a common DFIR practice for integrity verification) and avoids
+    allocating a new bytes object for every chunk read. Small files are read
+    in one call instead.
+    """
+    result = {"path": str(path)}
+    # Unbuffered: reads (or the memory map) bypass Python's buffering layer
+    with path.open("rb", buffering=0) as f:
+        # Small files: one read and one-shot digests, no streaming buffer needed
+        if os.fstat(f.fileno()).st_size < _SMALL_FILE_SIZE:
+            data = f.read()
+            for name in algorithms:
+                result[name] = hashlib.new(name, data).hexdigest()
+            return result
+
+        hashers = [hashlib.new(name) for name in algorithms]
+        _update_from_file(f, hashers)
+
+    for name, h in zip(algorithms, hashers):
+        result[name] = h.hexdigest()
+    return result
+
+
+def _try_hash_file(path: Path, algorithms: Sequence[str]) -> Optional[Dict[str, str]]:
+    """Hash a file, returning None instead of raising on read errors.
+
+    If a file cannot be read (permissions/corruption), it is skipped
+    gracefully. In DFIR, it's important not to halt on single-file errors.
     """
-    md5 = hashlib.md5()
-    sha1 = hashlib.sha1()
-    sha256 = hashlib.sha256()
-
-    # Use a 1MB chunk size to balance I/O throughput and memory usage
-    chunk_size = 1024 * 1024
-    with path.open("rb") as f:
-        while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            md5.update(chunk)
-            sha1.update(chunk)
-            sha256.update(chunk)
-
-    return {
-        "path": str(path),
-        "md5": md5.hexdigest(),
-        "sha1": sha1.hexdigest(),
-        "sha256": sha256.hexdigest(),
-    }
-
-
-def compute_hashes_for_case(case_path: Path) -> List[Dict[str, str]]:
-    """Walk the case directory recursively and hash all regular files.
+    try:
+        return _hash_file(path, algorithms)
+    except Exception:
+        return None
+
+
+def _hash_batch(paths: List[Path], algorithms: Sequence[str]) -> List[Optional[Dict[str, str]]]:
+    """Hash a batch of files sequentially within a single worker task."""
+    return [_try_hash_file(path, algorithms) for path in paths]
+
+
+def _hash_files(files: List[CaseFile], algorithms: Sequence[str]) -> Dict[Path, Dict[str, str]]:
+    """Hash files on a thread pool, returning results keyed by path.
+
+    Files that cannot be read are left out of the result.
+    """
+    # Materialize the work list first so it can be spread across workers.
+    # Small files are grouped into batches; larger files get a task each.
+    jobs: List[List[Path]] = []
+    batch: List[Path] = []
+    for f in files:
+        if f.st_size < _SMALL_FILE_SIZE:
+            batch.append(f.path)
+            if len(batch) == _SMALL_FILE_BATCH:
+                jobs.append(batch)
+                batch = []
+        else:
+            jobs.append([f.path])
+    if batch:
+        jobs.append(batch)
+
+    # hashlib releases the GIL while digesting large buffers (and file reads
+    # release it too), so plain threads hash several files truly in parallel
+    # without the process start-up and pickling costs of a process pool.
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        batches = executor.map(lambda paths: _hash_batch(paths, algorithms), jobs)
+        return {
+            path: h
+            for paths, hashed in zip(jobs, batches)
+            for path, h in zip(paths, hashed)
+            if h is not None
+        }
+
+
+def _open_cache(cache_path: Path) -> Optional[HashCache]:
+    """Open the hash cache, or return None (and log why) if it is unusable.
+
+    The cache only saves work; a corrupt or locked cache file must not stop
+    the analysis, so hashing then proceeds without it.
+    """
+    try:
+        return HashCache(cache_path)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Hash cache %s unavailable; hashing without it: %s", cache_path, e)
+        return None
+
+
+def compute_hashes_for_case(
+    case_path: Path,
+    files: Optional[List[CaseFile]] = None,
+    hash_algorithms: Sequence[str] = DEFAULT_HASH_ALGORITHMS,
+    cache_path: Optional[Path] = None,
+) -> List[Dict[str, str]]:
+    """Hash all regular files in the case directory.
+
+    'files' is the shared result of walk_case(); the directory is walked here
+    only when it is not provided.
+
+    Each file's content is read at most once: hard links to the same file are
+    hashed a single time, and when 'cache_path' is given, digests of files
+    unchanged since an earlier run are taken from the persistent HashCache.
+    Cache errors are logged and the files are hashed as if it were absent.
 
     This produces a comprehensive inventory of file fingerprints used for
     comparison, deduplication, and integrity checks.
 
-    Returns a list of dictionaries with keys: path, md5, sha1, sha256.
+    Returns a list of dictionaries with the keys 'path' and 'rel' (relative to
+    the case directory) plus one key per requested algorithm (e.g., 'sha256').
     """
+    # Validate algorithm names up front; otherwise every file would fail and be
+    # skipped silently below, producing an empty hash table.
+    algorithms = validate_hash_algorithms(hash_algorithms)
+
+    if files is None:
+        files = walk_case(case_path)
+
+    cache = _open_cache(cache_path) if cache_path is not None else None
+    try:
+        # Resolve digests by file identity: cached from an earlier run, or to
+        # be computed once even if several paths (hard links) share it
+        known: Dict[FileKey, Dict[str, str]] = {}
+        hits: List[FileKey] = []
+        queued = set()
+        to_hash: List[CaseFile] = []
+        for f in files:
+            key = file_key(f)
+            if key is None:
+                to_hash.append(f)
+                continue
+            if key in known or key in queued:
+                continue
+            digests = None
+            if cache is not None:
+                try:
+                    digests = cache.get(key, algorithms)
+                except sqlite3.Error as e:
+                    logger.warning("Hash cache lookup failed; hashing without it: %s", e)
+                    cache.close()
+                    cache = None
+            if digests is not None:
+                known[key] = digests
+                hits.append(key)
+            else:
+                queued.add(key)
+                to_hash.append(f)
+
+        hashed = _hash_files(to_hash, algorithms)
+
+        new_entries = []
+        for f in to_hash:
+            key = file_key(f)
+            h = hashed.get(f.path)
+            if key is not None and h is not None:
+                known[key] = {name: h[name] for name in algorithms}
+                new_entries.append((key, known[key]))
+        if cache is not None and (hits or new_entries):
+            try:
+                cache.update(hits, new_entries)
+            except sqlite3.Error as e:
+                logger.warning("Failed to update hash cache: %s", e)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    # Emit one entry per path in walk order; unreadable files are skipped.
+    # 'rel' (path relative to the case) is carried over from the walk.
     results: List[Dict[str, str]] = []
-    for path in case_path.rglob("*"):
-        # Skip directories and other non-files (like broken symlinks)
-        if not path.is_file():
-            continue
-        try:
-            results.append(_hash_file(path))
-        except Exception:
-            # If a file cannot be read (permissions/corruption), skip gracefully.
-            # In DFIR, it's important not to halt on single-file errors.
-            continue
-    return results
\ No newline at end of file
+    for f in files:
+        key = file_key(f)
+        if key is None:
+            h = hashed.get(f.path)
+            digests = {name: h[name] for name in algorithms} if h is not None else None
+        else:
+            digests = known.get(key)
+        if digests is not None:
+            result = {"path": str(f.path), "rel": f.rel}
+            result.update(digests)
+            results.append(result)
+    return results
@@ -1,8 +1,132 @@
 from pathlib import Path  # File system paths
-from typing import Any, Dict, List  # Structured event typing
+from typing import Any, Dict, Iterator, List, Optional  # Structured event typing
 import re  # Regular expressions for log line parsing
 from datetime import datetime  # Timestamp normalization
 
+from ._walk import CaseFile, walk_case  # Shared single-pass case traversal
+
+# Hyperscan (optional) scans raw bytes with a compiled automaton at memory
+# speed. It is used to find candidate auth.log lines so the Python regex only
+# runs on the few lines that can match; without it, the regex scans everything.
+try:
+    import hyperscan  # type: ignore[import-not-found]
+except ImportError:
+    hyperscan = None
+
+# Patterns are compiled once at import and run with finditer over large blocks
+# of the file in MULTILINE mode, so '^' anchors at each line start and no list
+# of lines is built. '[^\S\n]' is '\s' minus newline: a match never spans
+# lines, which is what makes scanning line-aligned blocks independently safe.
+
+# Supports both 'Failed password for user' and 'Failed password for invalid user user'
+_AUTH_RE = re.compile(
+    r"^(?P<ts>\w{3}[^\S\n]+\d{1,2}[^\S\n]+\d{2}:\d{2}:\d{2}).*Failed password for(?: invalid user)?[^\S\n]+(?P<user>\S+)[^\S\n]+from[^\S\n]+(?P<ip>\d{1,3}(?:\.\d{1,3}){3})",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_ACCESS_RE = re.compile(
+    r"^(?P<ip>\d{1,3}(?:\.\d{1,3}){3}).*\[(?P<ts>[^\]\n]+)\][^\S\n]+\"(?P<method>\S+)[^\S\n]+(?P<path>\S+)[^\S\n]+[^\"\n]+\"[^\S\n]+(?P<status>\d{3})",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+# Month abbreviations for hand-rolled timestamp parsing; strptime is much
+# slower per call and the formats used here are fixed
+_MONTHS = {
+    name: i + 1
+    for i, name in enumerate(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
+}
+
+# Logs are read in 8MB line-aligned blocks so memory stays bounded on GB-scale
+# files while each regex/Hyperscan call still covers many lines at once
+_LOG_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _iter_log_blocks(path: Path) -> Iterator[bytes]:
+    """Yield a file in large blocks that always end on a line boundary."""
+    pending: List[bytes] = []
+    with path.open("rb") as f:
+        while True:
+            block = f.read(_LOG_BLOCK_SIZE)
+            if not block:
+                break
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                # No newline yet (very long line); keep reading
+                pending.append(block)
+                continue
+            pending.append(block[:cut])
+            yield b"".join(pending)
+            pending = [block[cut:]]
+    tail = b"".join(pending)
+    if tail:
+        yield tail
+
+
+def _iter_log_text(path: Path) -> Iterator[str]:
+    """Yield the decoded text of a log file block by block."""
+    for block in _iter_log_blocks(path):
+        yield block.decode(errors="ignore")
+
+
+def _iter_matches(pattern: "re.Pattern[str]", texts: Iterator[str]) -> Iterator["re.Match[str]"]:
+    """Run pattern.finditer over each text block in turn."""
+    for text in texts:
+        yield from pattern.finditer(text)
+
+
+def _compile_auth_prefilter() -> Any:
+    """Compile the Hyperscan database that locates 'Failed password for' lines."""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[b"Failed password for"],
+            ids=[0],
+            elements=1,
+            flags=[hyperscan.HS_FLAG_CASELESS],
+        )
+        return db
+    except Exception:
+        # A broken/unsupported Hyperscan install falls back to pure Python
+        return None
+
+
+_AUTH_HS_DB = _compile_auth_prefilter()
+
+
+def _iter_auth_log_text(path: Path) -> Iterator[str]:
+    """Yield the auth.log text to run _AUTH_RE over, block by block.
+
+    With Hyperscan, only lines containing 'Failed password for' are kept;
+    otherwise every line is passed through.
+    """
+    if _AUTH_HS_DB is None:
+        yield from _iter_log_text(path)
+        return
+
+    # Scratch space is per call so concurrent analyses can share the database
+    scratch = hyperscan.Scratch(_AUTH_HS_DB)
+    for data in _iter_log_blocks(path):
+        lines: List[bytes] = []
+        last_start = -1
+
+        def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> None:
+            nonlocal last_start
+            # Matches arrive in order of end offset; keep each line only once
+            line_start = data.rfind(b"\n", 0, end) + 1
+            if line_start == last_start:
+                return None
+            last_start = line_start
+            line_end = data.find(b"\n", end)
+            lines.append(data[line_start:] if line_end == -1 else data[line_start:line_end])
+            return None
+
+        _AUTH_HS_DB.scan(data, match_event_handler=on_match, scratch=scratch)
+        if lines:
+            yield b"\n".join(lines).decode(errors="ignore")
+
 
 def _parse_auth_log(path: Path) -> List[Dict[str, Any]]:
     """Parse SSH auth.log for failed login attempts.
@@ -12,37 +136,36 @@ def _parse_auth_log(path: Path) -> List[Dict[str, Any]]:
     This parser extracts the timestamp, user, and IP when possible.
     """
     events: List[Dict[str, Any]] = []
-
-    # Pattern supports both 'Failed password for user' and 'Failed password for invalid user user'
-    pattern = re.compile(
-        r"^(?P<ts>\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}).*Failed password for(?: invalid user)?\s+(?P<user>\S+)\s+from\s+(?P<ip>\d{1,3}(?:\.\d{1,3}){3})",
-        re.IGNORECASE,
-    )
+    append = events.append
+    source = str(path)
+    # auth.log lacks a year; we approximate with the current year
+    current_year = datetime.utcnow().year
+    # Bursts of attempts share timestamps; normalize each distinct one once
+    ts_cache: Dict[str, str] = {}
 
     try:
-        for line in path.read_text(errors="ignore").splitlines():
-            m = pattern.search(line)
-            if not m:
-                continue
-            ts_raw = m.group("ts")
-            user = m.group("user")
-            ip = m.group("ip")
-
-            # auth.log lacks a year; we approximate with the current year
-            try:
-                dt = datetime.strptime(ts_raw, "%b %d %H:%M:%S")
-                dt = dt.replace(year=datetime.utcnow().year)
-                ts_norm = dt.isoformat()
-            except Exception:
-                ts_norm = ts_raw
-
-            events.append(
+        for m in _iter_matches(_AUTH_RE, _iter_auth_log_text(path)):
+            ts_raw, user, ip = m.group("ts", "user", "ip")
+
+            ts_norm = ts_cache.get(ts_raw)
+            if ts_norm is None:
+                # 'Jan 10 12:34:56' -> month/day/time parsed without strptime
+                try:
+                    month, day, hms = ts_raw.split()
+                    hour, minute, second = hms.split(":")
+                    dt = datetime(current_year, _MONTHS[month.title()], int(day), int(hour), int(minute), int(second))
+                    ts_norm = dt.isoformat()
+                except Exception:
+                    ts_norm = ts_raw
+                ts_cache[ts_raw] = ts_norm
+
+            append(
                 {
                     "timestamp": ts_norm,
                     "type": "ssh_failed_login",
                     "user": user,
                     "ip": ip,
-                    "source": str(path),
+                    "source": source,
                 }
             )
     except Exception:
@@ -58,30 +181,28 @@ def _parse_access_log(path: Path) -> List[Dict[str, Any]]:
     '1.2.3.4 - - [10/Oct/2000:13:55:36 -0700] "GET /index.html HTTP/1.0" 200 2326'
     """
     events: List[Dict[str, Any]] = []
-    pattern = re.compile(
-        r"^(?P<ip>\d{1,3}(?:\.\d{1,3}){3}).*\[(?P<ts>[^\]]+)\]\s+\"(?P<method>\S+)\s+(?P<path>\S+)\s+[^\"]+\"\s+(?P<status>\d{3})",
-        re.IGNORECASE,
-    )
+    append = events.append
+    source = str(path)
+    # Busy servers log many requests per second; normalize each timestamp once
+    ts_cache: Dict[str, str] = {}
 
     try:
-        for line in path.read_text(errors="ignore").splitlines():
-            m = pattern.search(line)
-            if not m:
-                continue
-            ip = m.group("ip")
-            ts_raw = m.group("ts")
-            method = m.group("method")
-            req_path = m.group("path")
-            status = m.group("status")
-
-            # Attempt to normalize timestamps like '10/Oct/2000:13:55:36 -0700'
-            try:
-                dt = datetime.strptime(ts_raw.split()[0], "%d/%b/%Y:%H:%M:%S")
-                ts_norm = dt.isoformat()
-            except Exception:
-                ts_norm = ts_raw
-
-            events.append(
+        for m in _iter_matches(_ACCESS_RE, _iter_log_text(path)):
+            ip, ts_raw, method, req_path, status = m.group("ip", "ts", "method", "path", "status")
+
+            ts_norm = ts_cache.get(ts_raw)
+            if ts_norm is None:
+                # Attempt to normalize timestamps like '10/Oct/2000:13:55:36 -0700'
+                try:
+                    day, month, rest = ts_raw.split()[0].split("/")
+                    year, hour, minute, second = rest.split(":")
+                    dt = datetime(int(year), _MONTHS[month.title()], int(day), int(hour), int(minute), int(second))
+                    ts_norm = dt.isoformat()
+                except Exception:
+                    ts_norm = ts_raw
+                ts_cache[ts_raw] = ts_norm
+
+            append(
                 {
                     "timestamp": ts_norm,
                     "type": "http_request",
@@ -89,7 +210,7 @@ def _parse_access_log(path: Path) -> List[Dict[str, Any]]:
                     "method": method,
                     "path": req_path,
                     "status": status,
-                    "source": str(path),
+                    "source": source,
                 }
             )
     except Exception:
@@ -98,19 +219,22 @@ def _parse_access_log(path: Path) -> List[Dict[str, Any]]:
     return events
 
 
-def parse_logs_for_case(case_path: Path) -> List[Dict[str, Any]]:
+def parse_logs_for_case(case_path: Path, files: Optional[List[CaseFile]] = None) -> List[Dict[str, Any]]:
     """Locate and parse typical SSH and HTTP logs to produce event records.
 
     - auth.log: Extract failed SSH login attempts
     - *access.log*: Extract HTTP request events from Apache-style logs
+
+    'files' is the shared result of walk_case(); the directory is walked here
+    only when it is not provided.
     """
+    if files is None:
+        files = walk_case(case_path)
     events: List[Dict[str, Any]] = []
-    for path in case_path.rglob("*"):
-        if not path.is_file():
-            continue
-        name = path.name.lower()
+    for f in files:
+        name = f.name.lower()
         if name == "auth.log":
-            events.extend(_parse_auth_log(path))
+            events.extend(_parse_auth_log(f.path))
         elif "access.log" in name:
-            events.extend(_parse_access_log(path))
+            events.extend(_parse_access_log(f.path))
     return events
\ No newline at end of file
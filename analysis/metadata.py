@@ -1,11 +1,19 @@
 from pathlib import Path  # Filesystem path handling
-from typing import Any, Dict, List  # Type hints for structured metadata results
+from typing import Any, Callable, Dict, List, Optional  # Type hints for structured metadata results
+from concurrent.futures import ThreadPoolExecutor  # Extract metadata from several files at once
+import os  # CPU count for sizing the worker pool
 
 # exifread is robust for JPEG EXIF; Pillow can provide PNG info dictionaries
 import exifread  # Extracts EXIF tags (e.g., camera model, timestamps, GPS)
 from PIL import Image  # General image handling; exposes PNG text chunks via .info
 from PyPDF2 import PdfReader  # Reads PDF document info (author, title, creation)
-from docx import Document  # Reads DOCX core properties (author, created/modified)
+
+# DOCX core properties live in a small XML part inside the ZIP container
+import zipfile  # Open the DOCX package
+import xml.etree.ElementTree as ET  # Parse docProps/core.xml
+from datetime import datetime, timezone  # Normalize created/modified timestamps
+
+from ._walk import CaseFile, walk_case  # Shared single-pass case traversal
 
 
 def _safe_open_image(path: Path) -> Image.Image | None:
@@ -82,61 +90,103 @@ def _extract_pdf_metadata(path: Path) -> Dict[str, Any]:
     return meta
 
 
+# XML namespaces used by docProps/core.xml
+_CORE_NS = {
+    "cp": "http://schemas.openxmlformats.org/package/2006/metadata/core-properties",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "dcterms": "http://purl.org/dc/terms/",
+}
+
+# core.xml is a few KB; refuse absurd sizes rather than inflate a ZIP bomb
+_MAX_CORE_XML_SIZE = 1024 * 1024
+
+
+def _parse_w3cdtf(value: str | None) -> datetime | None:
+    """Parse a W3CDTF timestamp (e.g., '2024-01-02T03:04:05Z') into a UTC datetime."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # Office writes UTC; treat naive values as UTC as well
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
 def _extract_docx_metadata(path: Path) -> Dict[str, Any]:
-    """Extract core properties from a DOCX using python-docx.
+    """Extract core properties from a DOCX's docProps/core.xml.
 
     Many organizations rely on these properties for document management; they
     are useful in DFIR to understand authorship and modification timelines.
+    Only the core-properties part is read; the document body, styles, and
+    sections are never parsed.
     """
     meta: Dict[str, Any] = {}
     try:
-        doc = Document(path)
-        props = doc.core_properties
+        with zipfile.ZipFile(path) as z:
+            info = z.getinfo("docProps/core.xml")
+            if info.file_size > _MAX_CORE_XML_SIZE:
+                return {}
+            root = ET.fromstring(z.read(info))
+
+        def text(tag: str) -> str:
+            return root.findtext(tag, default="", namespaces=_CORE_NS)
+
         # Collect a subset of useful properties
-        meta["author"] = props.author
-        meta["last_modified_by"] = props.last_modified_by
-        meta["created"] = str(props.created)
-        meta["modified"] = str(props.modified)
-        meta["title"] = props.title
-        meta["subject"] = props.subject
-        meta["category"] = props.category
-        meta["comments"] = props.comments
-        meta["keywords"] = props.keywords
+        meta["author"] = text("dc:creator")
+        meta["last_modified_by"] = text("cp:lastModifiedBy")
+        meta["created"] = str(_parse_w3cdtf(text("dcterms:created")))
+        meta["modified"] = str(_parse_w3cdtf(text("dcterms:modified")))
+        meta["title"] = text("dc:title")
+        meta["subject"] = text("dc:subject")
+        meta["category"] = text("cp:category")
+        meta["comments"] = text("dc:description")
+        meta["keywords"] = text("cp:keywords")
     except Exception:
         return {}
     return meta
 
 
-def extract_metadata_for_case(case_path: Path) -> List[Dict[str, Any]]:
-    """Walk the case directory and extract metadata for supported file types.
+# Lower-cased file suffix -> metadata extractor
+_EXTRACTORS: Dict[str, Callable[[Path], Dict[str, Any]]] = {
+    ".jpg": _extract_exif_with_exifread,
+    ".jpeg": _extract_exif_with_exifread,
+    ".png": _extract_png_info,
+    ".pdf": _extract_pdf_metadata,
+    ".docx": _extract_docx_metadata,
+}
+
+
+def extract_metadata_for_case(case_path: Path, files: Optional[List[CaseFile]] = None) -> List[Dict[str, Any]]:
+    """Extract metadata for supported file types in the case directory.
 
     Supported:
     - Images: .jpg/.jpeg via EXIF (exifread), .png via Pillow .info
     - PDFs: PyPDF2 reader metadata
-    - DOCX: python-docx core properties
+    - DOCX: core properties from docProps/core.xml
+
+    'files' is the shared result of walk_case(); the directory is walked here
+    only when it is not provided.
 
-    Returns a list of entries: {path, metadata: {key: value, ...}}.
+    Returns a list of entries: {path, rel, metadata: {key: value, ...}}, where
+    'rel' is the path relative to the case directory.
     """
+    if files is None:
+        files = walk_case(case_path)
+
+    # Pick the extractor per file up front; unsupported types are skipped
+    supported = [f for f in files if f.suffix in _EXTRACTORS]
+
+    # Extractors are independent and dominated by file I/O and zlib/parsing,
+    # so a thread pool overlaps them; map() keeps results in file order.
+    with ThreadPoolExecutor(max_workers=min(32, 4 * (os.cpu_count() or 1))) as executor:
+        extracted = list(executor.map(lambda f: _EXTRACTORS[f.suffix](f.path), supported))
+
     results: List[Dict[str, Any]] = []
-    for path in case_path.rglob("*"):
-        if not path.is_file():
-            continue
-
-        suffix = path.suffix.lower()
-        metadata: Dict[str, Any] | None = None
-
-        if suffix in {".jpg", ".jpeg"}:
-            metadata = _extract_exif_with_exifread(path)
-        elif suffix == ".png":
-            metadata = _extract_png_info(path)
-        elif suffix == ".pdf":
-            metadata = _extract_pdf_metadata(path)
-        elif suffix == ".docx":
-            metadata = _extract_docx_metadata(path)
-        else:
-            metadata = None
-
-        if metadata is not None and metadata:
-            results.append({"path": str(path), "metadata": metadata})
-
-    return results
\ No newline at end of file
+    for f, metadata in zip(supported, extracted):
+        if metadata:
+            results.append({"path": str(f.path), "rel": f.rel, "metadata": metadata})
+
+    return results
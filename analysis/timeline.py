@@ -2,62 +2,118 @@
 
 This module provides utilities to:
 - Normalize and sort events in chronological order
-- Render simple Markdown tables
+- Stream simple Markdown tables straight to the report file
 - Generate a complete case report including file hashes, metadata findings,
   and a human-readable event timeline
 """
 
 from pathlib import Path  # File path handling
-from typing import Any, Dict, List, Tuple  # Structured event types and sort key
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple  # Structured event types and streams
 from datetime import datetime  # Timestamp parsing for timeline ordering
 
+from .hashing import DEFAULT_HASH_ALGORITHMS, validate_hash_algorithms  # Names of the hash columns
 
-def _event_sort_key(event: Dict[str, Any]) -> Tuple[int, str]:
-    """Produce a stable, sortable key for an event.
+
+def _event_epoch(event: Dict[str, Any]) -> float:
+    """Produce a sortable Unix timestamp for an event.
 
     - Prefer ISO8601 timestamps (e.g., '2025-01-01T12:00:00') and convert
-      them to a Unix timestamp integer for accurate sorting.
+      them to a Unix timestamp for accurate sorting (sub-second precision kept).
     - If parsing fails, return a default (0) so such events group at the start.
-    - Include the original timestamp string to keep sort stable among equals.
     """
     ts = event.get("timestamp")
     if isinstance(ts, str):
         try:
-            dt = datetime.fromisoformat(ts)
-            return (int(dt.timestamp()), ts)
+            return datetime.fromisoformat(ts).timestamp()
         except Exception:
             pass
     # Fallback: treat missing/unparseable timestamps as earliest
-    return (0, str(ts))
+    return 0.0
 
 
 def build_timeline(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Normalize and sort events chronologically.
+    """Sort events chronologically.
 
-    - Creates a shallow copy of events to avoid mutating caller data.
-    - Sorts using the sort key that prefers ISO timestamps.
-    Returns a new list sorted by timestamp, best-effort normalization.
+    - Each timestamp is parsed exactly once (sorted() computes keys up front)
+      and events are then ordered by a plain float comparison.
+    - The sort is stable, so events with equal timestamps keep their order.
+    Returns a new list; the event dicts themselves are shared, not copied,
+    since downstream consumers only read them.
     """
-    # Copy events to avoid mutating caller data
-    normalized = [dict(e) for e in events]
-    normalized.sort(key=_event_sort_key)
-    return normalized
+    return sorted(events, key=_event_epoch)
 
 
-def _md_table(headers: List[str], rows: List[List[str]]) -> str:
-    """Build a simple Markdown table string from headers and rows.
+def _write_md_table(out: TextIO, headers: List[str], rows: Iterable[Tuple[str, ...]]) -> None:
+    """Write a simple Markdown table to an open text stream, row by row.
 
     The format uses a header row and a separator row of '---' to be compatible
-    with common Markdown renderers.
+    with common Markdown renderers. Rows are consumed lazily so large tables
+    are never held in memory as a whole.
     """
     # Header row
-    out = ["| " + " | ".join(headers) + " |"]
+    out.write("| " + " | ".join(headers) + " |\n")
     # Separator row (use --- for each column)
-    out.append("| " + " | ".join(["---"] * len(headers)) + " |")
-    # Data rows
-    for r in rows:
-        out.append("| " + " | ".join(r) + " |")
-    return "\n".join(out)
+    out.write("| " + " | ".join(["---"] * len(headers)) + " |\n")
+    # Data rows: one prebuilt %-format string per table ('| %s | %s |\n')
+    # avoids building a list and concatenating strings for every row
+    row_fmt = "| " + " | ".join(["%s"] * len(headers)) + " |\n"
+    out.writelines(row_fmt % r for r in rows)
+
+
+def _rel_path(entry: Dict[str, Any], case_path: Path) -> str:
+    """Return an entry's path relative to the case directory.
+
+    Analysis stages store it as 'rel' when they build the entry; it is only
+    derived from 'path' for entries produced elsewhere.
+    """
+    rel = entry.get("rel")
+    if rel is not None:
+        return rel
+    path_str = entry.get("path", "")
+    return str(Path(path_str).relative_to(case_path)) if path_str else ""
+
+
+def _hash_rows(hashes: List[Dict[str, Any]], case_path: Path, hash_algorithms: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+    """Yield file hash table rows (relative path + one digest per algorithm)."""
+    for h in hashes:
+        yield (_rel_path(h, case_path), *[h.get(name, "") for name in hash_algorithms])
+
+
+def _format_ssh_failed_login(e: Dict[str, Any]) -> str:
+    return f"Failed SSH login for user `{e.get('user', '')}` from {e.get('ip', '')} (source: {e.get('source', '')})"
+
+
+def _format_http_request(e: Dict[str, Any]) -> str:
+    return (
+        f"HTTP {e.get('method', '')} {e.get('path', '')} from {e.get('ip', '')} "
+        f"with status {e.get('status', '')} (source: {e.get('source', '')})"
+    )
+
+
+def _format_browser_visit(e: Dict[str, Any]) -> str:
+    return f"Visited {e.get('url', '')} ({e.get('title') or ''}) (source: {e.get('source', '')})"
+
+
+def _format_generic(e: Dict[str, Any]) -> str:
+    # Generic detail fallback for event types without a dedicated formatter
+    return f"Event details: {e}"
+
+
+# Event type -> details formatter; one dict lookup per event instead of an
+# if/elif chain of string comparisons
+_FORMATTERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "ssh_failed_login": _format_ssh_failed_login,
+    "http_request": _format_http_request,
+    "browser_visit": _format_browser_visit,
+}
+
+
+def _timeline_rows(timeline: List[Dict[str, Any]]) -> Iterator[Tuple[str, str, str]]:
+    """Yield timeline table rows with human-readable details."""
+    for e in timeline:
+        etype = str(e.get("type", ""))
+        details = _FORMATTERS.get(etype, _format_generic)(e)
+        yield (str(e.get("timestamp", "")), etype, details)
 
 
 def write_report(
@@ -67,77 +123,62 @@ def write_report(
     metadata: List[Dict[str, Any]],
     timeline: List[Dict[str, Any]],
     reports_dir: Path,
+    hash_algorithms: Sequence[str] = DEFAULT_HASH_ALGORITHMS,
 ) -> Path:
     """Generate a Markdown report and return its file path.
 
     The report includes:
     - Title and case info
-    - File hash table (MD5/SHA1/SHA256)
+    - File hash table (one column per computed algorithm, e.g. SHA256)
     - Metadata findings grouped by file
     - Timeline table (Timestamp, Type, Details)
+
+    Sections are streamed to the file as they are formatted, so memory use
+    stays flat even for cases with millions of events.
+
+    'hash_algorithms' must be the list given to compute_hashes_for_case; it
+    names the hash columns, so other keys in the hash entries never show up
+    as digests.
     """
     reports_dir.mkdir(parents=True, exist_ok=True)
     report_path = reports_dir / f"case_{case_id}_report.md"
 
-    # Build file hash table rows
-    hash_rows: List[List[str]] = []
-    for h in hashes:
-        rel = str(Path(h["path"]).relative_to(case_path)) if h.get("path") else ""
-        hash_rows.append([rel, h.get("md5", ""), h.get("sha1", ""), h.get("sha256", "")])
-
-    # Build metadata sections per file
-    meta_sections: List[str] = []
-    for m in metadata:
-        path_str = m.get("path", "")
-        rel = str(Path(path_str).relative_to(case_path)) if path_str else ""
-        items = m.get("metadata", {})
-        meta_sections.append(f"### {rel}\n" + "\n".join([f"- {k}: {v}" for k, v in items.items()]))
-
-    # Build timeline rows with human-readable details
-    tl_rows: List[List[str]] = []
-    for e in timeline:
-        ts = str(e.get("timestamp", ""))
-        etype = str(e.get("type", ""))
-        details = ""
-        source = e.get("source", "")
-        if etype == "ssh_failed_login":
-            details = f"Failed SSH login for user `{e.get('user', '')}` from {e.get('ip', '')} (source: {source})"
-        elif etype == "http_request":
-            details = f"HTTP {e.get('method', '')} {e.get('path', '')} from {e.get('ip', '')} with status {e.get('status', '')} (source: {source})"
-        elif etype == "browser_visit":
-            title = e.get("title") or ""
-            details = f"Visited {e.get('url', '')} ({title}) (source: {source})"
+    # Normalized the same way as by compute_hashes_for_case, so names match its keys
+    hash_algorithms = validate_hash_algorithms(hash_algorithms)
+
+    # A 1MB write buffer keeps the number of write() syscalls low
+    with report_path.open("w", encoding="utf-8", buffering=1024 * 1024) as out:
+        out.write(f"# DFIR Case Report: {case_id}\n\n")
+        out.write(f"Case directory: {case_path}\n\n")
+
+        # Hash section
+        out.write("## File Hashes\n\n")
+        if hashes:
+            headers = ["File"] + [name.upper() for name in hash_algorithms]
+            _write_md_table(out, headers, _hash_rows(hashes, case_path, hash_algorithms))
         else:
-            # Generic detail fallback
-            details = f"Event details: {e}"
-        tl_rows.append([ts, etype, details])
-
-    lines: List[str] = []
-    lines.append(f"# DFIR Case Report: {case_id}")
-    lines.append("")
-    lines.append(f"Case directory: {case_path}")
-    lines.append("")
-
-    # Hash section
-    lines.append("## File Hashes")
-    lines.append("")
-    lines.append(_md_table(["File", "MD5", "SHA1", "SHA256"], hash_rows) if hash_rows else "(No files hashed)")
-    lines.append("")
-
-    # Metadata section
-    lines.append("## Metadata Findings")
-    lines.append("")
-    if meta_sections:
-        lines.append("\n\n".join(meta_sections))
-    else:
-        lines.append("(No metadata found)")
-    lines.append("")
-
-    # Timeline section
-    lines.append("## Event Timeline")
-    lines.append("")
-    lines.append(_md_table(["Timestamp", "Type", "Details"], tl_rows) if tl_rows else "(No events found)")
-    lines.append("")
-
-    report_path.write_text("\n".join(lines), encoding="utf-8")
-    return report_path
\ No newline at end of file
+            out.write("(No files hashed)\n")
+        out.write("\n")
+
+        # Metadata section: one '### file' block per file, separated by blank lines
+        out.write("## Metadata Findings\n\n")
+        if metadata:
+            for i, m in enumerate(metadata):
+                rel = _rel_path(m, case_path)
+                items = m.get("metadata", {})
+                if i:
+                    out.write("\n\n")
+                out.write(f"### {rel}\n" + "\n".join([f"- {k}: {v}" for k, v in items.items()]))
+            out.write("\n")
+        else:
+            out.write("(No metadata found)\n")
+        out.write("\n")
+
+        # Timeline section
+        out.write("## Event Timeline\n\n")
+        if timeline:
+            _write_md_table(out, ["Timestamp", "Type", "Details"], _timeline_rows(timeline))
+        else:
+            out.write("(No events found)\n")
+
+    return report_path
@@ -1,13 +1,22 @@
 import asyncio  # Python's asynchronous I/O framework; enables async functions used by the bot
 import logging  # Standard logging for visibility into bot actions (case creation, file saves, analysis)
 import os  # Access environment variables loaded from .env
-import uuid  # Generate random unique case IDs
+import re  # Reject unsafe archive member names
+import secrets  # Generate random unique case IDs
+import sqlite3  # Persistent registry of each user's current case
+import struct  # Parse ZIP local file headers
+import tarfile  # Stream-extract uploaded tar archives (optionally gzip/bzip2/xz-compressed)
+import weakref  # Per-case locks that disappear once no handler holds them
+import zlib  # CRC check of ZIP members copied by the kernel
 from pathlib import Path  # Modern path handling for files/folders
-from typing import Optional  # Type hint for functions that may return a Path or None
-from zipfile import ZipFile  # Used to extract uploaded .zip archives
+from concurrent.futures import ThreadPoolExecutor  # Extract archive members in parallel
+from typing import Dict, Optional  # Type hints (e.g., functions that may return a Path or None)
+from zipfile import ZIP_STORED, ZipFile, ZipInfo  # Used to extract uploaded .zip archives
 
+import aiofiles  # Async file writes for streamed downloads
+import httpx  # Async HTTP client for streamed downloads (the same one python-telegram-bot uses)
 from dotenv import load_dotenv  # Loads environment variables from .env (e.g., TELEGRAM_BOT_TOKEN)
-from telegram import Update  # Telegram update object representing incoming messages/commands
+from telegram import Chat, File, InputFile, Update  # Telegram chats, file handles, uploads and update objects for incoming messages/commands
 from telegram.constants import ChatAction  # Chat actions like TYPING/UPLOAD_DOCUMENT for UX feedback
 from telegram.ext import (
     ApplicationBuilder,
@@ -17,11 +26,28 @@ from telegram.ext import (
     filters,
 )
 
+# libarchive (optional, via libarchive-c) reads an archive front to back in a
+# single pass with its C decoders, instead of seeking to every member through
+# the central directory. It also handles formats the stdlib cannot read (7z,
+# zstd). Without it, ZIP and tar archives use the stdlib zipfile/tarfile.
+try:
+    import libarchive  # type: ignore[import-not-found]
+except ImportError:
+    libarchive = None
+
+# uvloop (optional) is a faster drop-in asyncio event loop built on libuv
+try:
+    import uvloop  # type: ignore[import-not-found]
+except ImportError:
+    uvloop = None
+
 # Analysis modules
 # Import the core DFIR processing functions from our analysis package. These perform hashing,
 # metadata extraction, log parsing, browser history parsing, timeline building, and report writing.
 from analysis import (
+    walk_case,
     compute_hashes_for_case,
+    validate_hash_algorithms,
     extract_metadata_for_case,
     parse_logs_for_case,
     parse_browser_history,
@@ -40,6 +66,78 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).parent  # Project root directory
 CASES_DIR = BASE_DIR / "cases"  # Where per-case evidence is stored
 REPORTS_DIR = BASE_DIR / "reports"  # Where generated Markdown reports are saved
+HASH_CACHE_PATH = CASES_DIR / ".hash_cache.sqlite"  # Digests of already-hashed evidence files
+CASE_REGISTRY_PATH = CASES_DIR / ".case_registry.sqlite"  # Each user's current case, kept across restarts
+
+# Archive members are copied to disk in 1MB chunks: memory use stays constant
+# per member and large blocks keep the number of read/write calls low.
+_EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+# Uploads extracted into the case, by file name suffix. "zip" and "tar" have a
+# stdlib fallback; "libarchive" formats are only extracted when it is installed
+# (otherwise the upload is kept as-is). Plain '.gz'/'.zst' files are single
+# compressed files (e.g., rotated logs), not archives, and are kept as-is.
+_ARCHIVE_SUFFIXES = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar",
+    ".tgz": "tar",
+    ".tar.bz2": "tar",
+    ".tbz2": "tar",
+    ".tar.xz": "tar",
+    ".txz": "tar",
+    ".tar.zst": "libarchive",
+    ".tzst": "libarchive",
+    ".7z": "libarchive",
+}
+
+# Uploads are downloaded from Telegram in 512KB chunks and written as they
+# arrive, so a large evidence file never blocks the event loop on disk writes
+_DOWNLOAD_CHUNK_SIZE = 512 * 1024
+
+# Each user's current case lives in SQLite rather than in memory: it survives
+# restarts, memory does not grow with the number of users, and every update is
+# a single-row write instead of a rewrite of all state. Opened on first use.
+_case_db: Optional[sqlite3.Connection] = None
+
+# Case IDs whose folder this process has already created, so uploads can skip
+# the mkdir. Cleared when it reaches the cap; the cost is one extra mkdir.
+_MAX_KNOWN_CASES = 10_000
+_known_cases: set[str] = set()
+
+# Updates are handled concurrently, up to this many at once; the rest queue.
+# Each analysis runs its own hashing/parsing thread pools, so the cap also
+# bounds the number of busy worker threads.
+_MAX_CONCURRENT_UPDATES = 8
+
+# One lock per case, held while an upload writes into the case folder and
+# while an analysis reads it. Without it, a file truncated by an upload while
+# the hashing stage has it memory-mapped raises SIGBUS and kills the process.
+# Weak values: a lock is dropped as soon as no handler holds or waits on it.
+_case_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _case_lock(case_id: str) -> asyncio.Lock:
+    """Return the lock serialising uploads and analyses of one case."""
+    lock = _case_locks.get(case_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _case_locks[case_id] = lock
+    return lock
+
+
+def _hash_algorithms() -> tuple[str, ...]:
+    """Read and validate the digests to compute from HASH_ALGORITHMS (e.g., 'md5,sha1,sha256').
+
+    SHA256 alone is the default; MD5/SHA1 are opt-in because each one adds a
+    full extra pass over every evidence file. Called once at startup, so a
+    bad setting stops the bot instead of failing every /analyze.
+    """
+    raw = os.getenv("HASH_ALGORITHMS", "sha256")
+    try:
+        return validate_hash_algorithms(raw.split(","))
+    except ValueError as e:
+        raise RuntimeError(f"Invalid HASH_ALGORITHMS in .env: {e}") from None
 
 
 def _ensure_dirs() -> None:
@@ -52,42 +150,428 @@ def _ensure_dirs() -> None:
 
 
 def _generate_case_id() -> str:
-    """Generate a short case ID using the first 8 characters of a UUID4.
+    """Generate a short case ID of 8 random hex characters.
 
     Short IDs are easy to read and reference in chat, while remaining unique.
+    Only the 4 random bytes that are shown are drawn from the OS.
+    """
+    return secrets.token_hex(4)
+
+
+def _case_registry() -> sqlite3.Connection:
+    """Return the case registry connection, creating the database on first use.
+
+    WAL with synchronous=NORMAL avoids an fsync per write; a crash can at
+    worst lose the last few /newcase calls, not corrupt the registry. The
+    connection is only used on the event loop: every statement reads or
+    writes a single row, and under WAL readers never wait for the writer.
+    The busy timeout is kept short so that a database locked by some other
+    process fails the update quickly instead of stalling every chat.
+    """
+    global _case_db
+    if _case_db is None:
+        CASE_REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(CASE_REGISTRY_PATH), timeout=1)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cases ("
+            " user_id INTEGER PRIMARY KEY, case_id TEXT NOT NULL, ts INTEGER NOT NULL)"
+        )
+        _case_db = conn
+    return _case_db
+
+
+def _set_case(user_id: int, case_id: str) -> None:
+    """Make case_id the current case of user_id."""
+    conn = _case_registry()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO cases VALUES (?, ?, CAST(strftime('%s', 'now') AS INTEGER))",
+            (user_id, case_id),
+        )
+
+
+def _get_case(user_id: int) -> Optional[str]:
+    """Return the current case of user_id, or None if it has none."""
+    row = _case_registry().execute("SELECT case_id FROM cases WHERE user_id = ?", (user_id,)).fetchone()
+    return row[0] if row is not None else None
+
+
+def _remember_case_dir(case_id: str) -> None:
+    """Record that the folder of case_id exists, keeping the set bounded."""
+    if len(_known_cases) >= _MAX_KNOWN_CASES:
+        _known_cases.clear()
+    _known_cases.add(case_id)
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve disk space for a file about to be written, where supported.
+
+    Allocating a large member's extents up front avoids fragmenting it as it
+    grows. This is only an optimization: platforms without posix_fallocate and
+    filesystems that reject it are ignored. posix_fallocate also grows the
+    file to size, so callers must only pass a size they have checked, and
+    truncate the file to what was actually written afterwards.
+    """
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError:
+        pass
+
+
+# Extracted files are written through raw descriptors: no pathlib or io
+# wrapper objects per member. O_BINARY only exists (and matters) on Windows.
+_EXTRACT_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+# A compressed ZIP member is only preallocated when it claims to expand at most
+# this many times; members that claim more are still extracted, just without
+# the reservation.
+_MAX_PREALLOCATE_RATIO = 10
+
+
+def _zip_preallocation_size(member: ZipInfo, archive_size: int) -> int:
+    """Return how much disk space to reserve for a ZIP member, or 0 for none.
+
+    Sizes come from the archive itself, so they are only trusted when
+    plausible: the compressed data must fit in the archive, a stored member
+    must occupy exactly its declared size, and a compressed one may expand at
+    most _MAX_PREALLOCATE_RATIO times. Otherwise a few crafted bytes claiming
+    gigabytes would have that much reserved.
+    """
+    if member.compress_size > archive_size:
+        return 0
+    if member.compress_type == ZIP_STORED:
+        return member.file_size if member.file_size == member.compress_size else 0
+    if member.file_size <= member.compress_size * _MAX_PREALLOCATE_RATIO:
+        return member.file_size
+    return 0
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to fd, continuing after partial writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+# Stored (uncompressed) ZIP members are copied from the archive to their
+# target inside the kernel, without passing the bytes through Python.
+# Requires positional reads plus copy_file_range (Linux) or sendfile.
+_ZERO_COPY = hasattr(os, "pread") and (hasattr(os, "copy_file_range") or hasattr(os, "sendfile"))
+
+# ZIP local file header: 30 fixed bytes, then file name and extra field
+_ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+# Kernel-copied members are read back for their CRC, so they are opened read-write
+_STORED_OPEN_FLAGS = (_EXTRACT_OPEN_FLAGS & ~os.O_WRONLY) | os.O_RDWR
+
+
+def _stored_data_offset(zip_fd: int, member: ZipInfo) -> Optional[int]:
+    """Return the archive offset of a member's data, or None if unreadable.
+
+    The central directory only records where the local header starts; its
+    name and extra field lengths can differ from the central directory's, so
+    the header itself is read to find the data.
     """
-    return uuid.uuid4().hex[:8]
+    header = os.pread(zip_fd, _ZIP_LOCAL_HEADER.size, member.header_offset)
+    if len(header) != _ZIP_LOCAL_HEADER.size:
+        return None
+    signature, name_len, extra_len = _ZIP_LOCAL_HEADER.unpack(header)
+    if signature != b"PK\x03\x04":
+        return None
+    return member.header_offset + _ZIP_LOCAL_HEADER.size + name_len + extra_len
 
 
-def _safe_extract_zip(zip_path: Path, dest_dir: Path) -> int:
-    """Safely extract a ZIP archive into dest_dir, preventing path traversal.
+def _copy_stored_member(zip_fd: int, member: ZipInfo, target: str) -> bool:
+    """Copy an uncompressed, unencrypted member to target without userspace copies.
+
+    Returns False when the member is not eligible, the kernel copy fails
+    (e.g., sendfile to a regular file is unsupported), or the copied data does
+    not match the member's CRC; the caller then extracts it through zipfile,
+    which truncates anything written here and raises BadZipFile on a corrupt
+    member, as it does for compressed ones. The CRC is computed over the
+    written file, which is still in the page cache right after the copy.
+    """
+    if (
+        not _ZERO_COPY
+        or member.compress_type != ZIP_STORED
+        or member.flag_bits & 0x1
+        or member.file_size != member.compress_size
+    ):
+        return False
+    try:
+        offset = _stored_data_offset(zip_fd, member)
+        if offset is None or offset + member.file_size > os.fstat(zip_fd).st_size:
+            # Data would run past the end of the archive
+            return False
+        fd = os.open(target, _STORED_OPEN_FLAGS, 0o644)
+        try:
+            _preallocate(fd, member.file_size)
+            remaining = member.file_size
+            while remaining:
+                if hasattr(os, "copy_file_range"):
+                    copied = os.copy_file_range(zip_fd, fd, remaining, offset)
+                else:
+                    copied = os.sendfile(fd, zip_fd, offset, remaining)
+                if not copied:
+                    # Archive is shorter than its directory claims
+                    return False
+                offset += copied
+                remaining -= copied
+
+            crc = 0
+            position = 0
+            while position < member.file_size:
+                chunk = os.pread(fd, min(_EXTRACT_CHUNK_SIZE, member.file_size - position), position)
+                if not chunk:
+                    return False
+                crc = zlib.crc32(chunk, crc)
+                position += len(chunk)
+        finally:
+            os.close(fd)
+    except OSError:
+        return False
+    return crc == member.CRC
+
+
+# Archive member names that are rejected outright: absolute paths, Windows
+# drive prefixes, and any '..' component, with either separator. Backslashes
+# are only separators on Windows, but such names would become traversals if a
+# case folder is later copied there, so they are refused on every platform.
+_UNSAFE_MEMBER_NAME = re.compile(r"^[/\\]|^[A-Za-z]:|(?:^|[/\\])\.\.(?:[/\\]|$)")
+
+
+def _extraction_root(dest_dir: Path) -> str:
+    """Return the resolved destination directory with a trailing separator.
+
+    Computed once per archive and passed to _resolve_member_target. The
+    trailing separator makes the containment check exact: '/cases/abc' must
+    not accept '/cases/abcd/...'.
+    """
+    return os.path.join(str(dest_dir.resolve()), "")
+
+
+def _resolve_member_target(dest_root: str, member_name: str) -> Optional[str]:
+    """Return where an archive member should be written, or None if unsafe.
 
     Path traversal protection ensures files from the archive cannot escape
-    the case folder by using malicious paths like '../../outside'.
+    the case folder by using malicious paths like '../../outside' or absolute
+    paths. Suspicious names are rejected by a single regex match first. The
+    containment check then folds the path lexically with normpath, without
+    the per-member filesystem lookups of Path.resolve(); this is sufficient
+    because extraction only ever creates regular files and directories,
+    never symlinks.
+    """
+    if _UNSAFE_MEMBER_NAME.search(member_name):
+        return None
+    target = os.path.normpath(os.path.join(dest_root, member_name))
+    if not target.startswith(dest_root):
+        return None
+    return target
 
-    Returns the number of extracted members.
+
+def _extract_with_libarchive(archive_path: Path, dest_dir: Path) -> int:
+    """Extract an archive with libarchive in one sequential pass.
+
+    Only regular files are written; directories are created as needed and
+    links or device entries are skipped. libarchive reports tar hard links as
+    regular files of size 0, so they are checked for separately; like the
+    tarfile path, they are not extracted. Entries whose name libarchive cannot
+    decode have no pathname and are skipped. Returns the number of extracted
+    files.
     """
     count = 0
-    with ZipFile(zip_path) as zf:
+    dest_root = _extraction_root(dest_dir)
+    created_dirs = set()  # Parents already created; avoids a mkdir per member
+    with libarchive.file_reader(str(archive_path)) as archive:
+        for entry in archive:
+            if not entry.isfile or entry.islnk:
+                continue
+            pathname = entry.pathname
+            if not pathname:
+                continue
+            target = _resolve_member_target(dest_root, pathname)
+            if target is None:
+                # Skip dangerous member
+                continue
+            parent = os.path.dirname(target)
+            if parent not in created_dirs:
+                os.makedirs(parent, exist_ok=True)
+                created_dirs.add(parent)
+            # No preallocation: entry.size is only what the archive claims,
+            # and there is no compressed size to check it against
+            fd = os.open(target, _EXTRACT_OPEN_FLAGS, 0o644)
+            try:
+                for block in entry.get_blocks(_EXTRACT_CHUNK_SIZE):
+                    _write_all(fd, block)
+            finally:
+                os.close(fd)
+            count += 1
+    return count
+
+
+def _extract_with_zipfile(zip_path: Path, dest_dir: Path) -> int:
+    """Extract a ZIP archive with the stdlib zipfile module.
+
+    All members are validated and their directories created first; the files
+    are then decompressed on a thread pool (zlib releases the GIL while
+    inflating). Stored members are copied directly by the kernel where
+    possible.
+
+    Workers share a single ZipFile, so the central directory is parsed once
+    rather than once per thread; on archives with many entries that parsing
+    is pure Python and costs more than the extraction itself. zipfile keeps a
+    separate position for every open member and serializes the underlying
+    reads with a lock, while decompression runs outside it.
+
+    Returns the number of extracted members.
+    """
+    dest_root = _extraction_root(dest_dir)
+    # The archive is opened here and handed to ZipFile as a file object, so
+    # this function alone decides when it is closed; zipfile never closes a
+    # file object it was given, whatever its count of open members says.
+    with open(zip_path, "rb") as archive, ZipFile(archive) as zf:
+        # Validation pass: map each safe target to its member. If an archive
+        # lists the same name twice, the later entry wins, as with serial
+        # extraction.
+        targets: Dict[str, ZipInfo] = {}
         for member in zf.infolist():
             # Skip directories
             if member.is_dir():
                 continue
-            # Normalize member path and prevent traversal outside dest_dir
-            member_path = Path(member.filename)
-            # Join and resolve to ensure containment
-            target_path = (dest_dir / member_path).resolve()
-            if not str(target_path).startswith(str(dest_dir.resolve())):
+            target = _resolve_member_target(dest_root, member.filename)
+            if target is None:
                 # Skip dangerous member
                 continue
-            # Ensure parent directory exists
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            with zf.open(member) as src, target_path.open("wb") as dst:
-                dst.write(src.read())
-                count += 1
+            targets[target] = member
+
+        # Ensure parent directories exist before any worker starts writing.
+        # Many members share a directory, so each distinct parent is created
+        # only once.
+        for parent in {os.path.dirname(target) for target in targets}:
+            os.makedirs(parent, exist_ok=True)
+
+        # Positional reads for the zero-copy path do not move the file
+        # position that zipfile relies on
+        zip_fd = archive.fileno()
+        archive_size = os.fstat(zip_fd).st_size
+
+        def _extract(item: tuple[str, ZipInfo]) -> None:
+            target, member = item
+            if _copy_stored_member(zip_fd, member, target):
+                return
+            with zf.open(member) as src:
+                fd = os.open(target, _EXTRACT_OPEN_FLAGS, 0o644)
+                written = 0
+                try:
+                    _preallocate(fd, _zip_preallocation_size(member, archive_size))
+                    while True:
+                        chunk = src.read(_EXTRACT_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        _write_all(fd, chunk)
+                        written += len(chunk)
+                finally:
+                    # Drop any reserved space the member did not fill
+                    try:
+                        os.ftruncate(fd, written)
+                    finally:
+                        os.close(fd)
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            # Consuming the results re-raises the first extraction error
+            for _ in executor.map(_extract, targets.items()):
+                pass
+    return len(targets)
+
+
+def _extract_with_tarfile(tar_path: Path, dest_dir: Path) -> int:
+    """Extract a (possibly compressed) tar archive with the stdlib tarfile module.
+
+    The archive is read as a stream ('r|*'): members are written in the order
+    they appear, without seeking or building an index of the whole archive
+    first. Only regular files are written; links and device entries are
+    skipped. Returns the number of extracted files.
+    """
+    count = 0
+    dest_root = _extraction_root(dest_dir)
+    created_dirs = set()  # Parents already created; avoids a mkdir per member
+    with tarfile.open(tar_path, "r|*") as tf:
+        for member in tf:
+            if not member.isreg():
+                continue
+            target = _resolve_member_target(dest_root, member.name)
+            if target is None:
+                # Skip dangerous member
+                continue
+            parent = os.path.dirname(target)
+            if parent not in created_dirs:
+                os.makedirs(parent, exist_ok=True)
+                created_dirs.add(parent)
+            src = tf.extractfile(member)
+            # No preallocation: member.size is only what the header claims,
+            # and a truncated archive would leave the rest zero-filled
+            fd = os.open(target, _EXTRACT_OPEN_FLAGS, 0o644)
+            try:
+                while True:
+                    chunk = src.read(_EXTRACT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    _write_all(fd, chunk)
+            finally:
+                os.close(fd)
+            count += 1
     return count
 
 
+# Stdlib extractors for archive kinds that do not require libarchive
+_STDLIB_EXTRACTORS = {
+    "zip": _extract_with_zipfile,
+    "tar": _extract_with_tarfile,
+}
+
+
+def _archive_kind(path: Path) -> Optional[str]:
+    """Return the archive kind of an uploaded file, or None if it is not extracted.
+
+    Formats that only libarchive can read are reported as None when it is
+    not installed, so such uploads are kept as regular evidence files.
+    """
+    name = path.name.lower()
+    for suffix, kind in _ARCHIVE_SUFFIXES.items():
+        if name.endswith(suffix):
+            if kind == "libarchive" and libarchive is None:
+                return None
+            return kind
+    return None
+
+
+def _safe_extract_archive(archive_path: Path, dest_dir: Path) -> int:
+    """Safely extract an uploaded archive into dest_dir, preventing path traversal.
+
+    libarchive is used when installed; if it is missing or cannot read a ZIP
+    or tar archive, extraction falls back to the stdlib zipfile/tarfile.
+
+    Returns the number of extracted members.
+    """
+    kind = _archive_kind(archive_path)
+    if kind is None:
+        raise ValueError(f"Unsupported archive: {archive_path.name}")
+    if libarchive is not None:
+        try:
+            return _extract_with_libarchive(archive_path, dest_dir)
+        except libarchive.ArchiveError as e:
+            if kind not in _STDLIB_EXTRACTORS:
+                raise
+            logger.warning("libarchive failed on %s (%s); falling back to %sfile", archive_path.name, e, kind)
+    return _STDLIB_EXTRACTORS[kind](archive_path, dest_dir)
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start: send a welcome message with usage instructions.
 
@@ -97,7 +581,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     text = (
         "Welcome to DFIR Case Automation Bot!\n\n"
         "Use /newcase to create a case.\n"
-        "After creating a case, upload evidence files or a .zip.\n"
+        "After creating a case, upload evidence files or an archive (.zip, .tar.gz, ...).\n"
         "Then run /analyze to process the evidence and receive a Markdown report."
     )
     await update.message.reply_text(text)
@@ -106,26 +590,66 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def newcase(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /newcase: create a per-user case directory and store the case_id.
 
-    Each user gets their own current case, tracked via context.user_data.
+    Each user gets their own current case, tracked in the case registry.
     """
     case_id = _generate_case_id()
     case_path = CASES_DIR / case_id
     case_path.mkdir(parents=True, exist_ok=True)
 
-    # Store case_id in user-specific context
-    context.user_data["case_id"] = case_id
+    # Remember the case as this user's current one
+    _set_case(update.effective_user.id, case_id)
+    _remember_case_dir(case_id)
 
     logger.info("Created new case %s at %s for user %s", case_id, case_path, update.effective_user.id)
     await update.message.reply_text(
         f"New case created: {case_id}\n"
-        f"Upload evidence files or a .zip to this chat; they will be saved to cases/{case_id}."
+        f"Upload evidence files or an archive to this chat; they will be saved to cases/{case_id}."
     )
 
 
+async def _download_file(file: File, dest: Path) -> None:
+    """Stream a Telegram file to dest chunk by chunk.
+
+    Chunks are written with aiofiles, so the event loop keeps serving other
+    updates during large downloads. When file_path is not an http(s) URL (a
+    local Bot API server returns paths on disk), PTB's download_to_drive is
+    used instead.
+
+    The file is written to 'dest.part' and renamed to dest only once it is
+    complete; a download that fails midway leaves nothing in the case that a
+    later /analyze would report as evidence.
+
+    PTB's own request object can only return a whole response body (its
+    download_to_drive holds the file in memory), so streaming needs a separate
+    httpx client. It does not see settings made on ApplicationBuilder; this
+    bot sets none, and like PTB's default client it takes proxies from the
+    HTTP(S)_PROXY environment variables. The connect timeout matches PTB's
+    default; reads get longer since a chunk of a large file can be slow.
+    """
+    url = file.file_path or ""
+    part = dest.with_name(dest.name + ".part")
+    try:
+        if not url.startswith(("http://", "https://")):
+            await file.download_to_drive(custom_path=str(part))
+        else:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=5.0)) as client:
+                async with client.stream("GET", url) as response:
+                    if response.is_error:
+                        # The URL embeds the bot token, so it is kept out of the error
+                        raise RuntimeError(f"Telegram file download failed with HTTP {response.status_code}")
+                    async with aiofiles.open(part, "wb") as f:
+                        async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                            await f.write(chunk)
+        os.replace(part, dest)
+    finally:
+        # Only left behind if the download failed
+        part.unlink(missing_ok=True)
+
+
 async def _save_document(update: Update, context: ContextTypes.DEFAULT_TYPE, case_path: Path) -> Optional[Path]:
     """Save an uploaded Telegram Document to the case directory.
 
-    Telegram 'document' messages cover generic files, including ZIP archives.
+    Telegram 'document' messages cover generic files, including archives.
     Returns the saved file path, or None if saving fails.
     """
     if not update.message or not update.message.document:
@@ -135,7 +659,7 @@ async def _save_document(update: Update, context: ContextTypes.DEFAULT_TYPE, cas
     file = await doc.get_file()
     filename = doc.file_name or f"document_{doc.file_unique_id}"
     dest = case_path / filename
-    await file.download_to_drive(custom_path=str(dest))
+    await _download_file(file, dest)
     logger.info("Saved document to %s", dest)
     return dest
 
@@ -151,56 +675,81 @@ async def _save_photo(update: Update, context: ContextTypes.DEFAULT_TYPE, case_p
     file = await photo.get_file()
     # Photos may not have filenames; use a generated name
     dest = case_path / f"photo_{photo.file_unique_id}.jpg"
-    await file.download_to_drive(custom_path=str(dest))
+    await _download_file(file, dest)
     logger.info("Saved photo to %s", dest)
     return dest
 
 
 async def handle_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle file/photo uploads: save to the current case and extract ZIPs.
+    """Handle file/photo uploads: save to the current case and extract archives.
 
     If a case is not set, the user is guided to create one first.
-    ZIP archives are extracted and the original archive is removed to reduce clutter.
+    Archives are extracted and the original archive is removed to reduce clutter.
     """
-    case_id = context.user_data.get("case_id")
+    case_id = _get_case(update.effective_user.id)
     if not case_id:
         await update.message.reply_text("Create a case first with /newcase.")
         return
     case_path = CASES_DIR / case_id
-    case_path.mkdir(parents=True, exist_ok=True)
-
-    await update.message.chat.send_action(ChatAction.UPLOAD_DOCUMENT)
-
-    saved_path: Optional[Path] = None
-    if update.message.document:
-        saved_path = await _save_document(update, context, case_path)
-    elif update.message.photo:
-        saved_path = await _save_photo(update, context, case_path)
-
-    if not saved_path:
-        await update.message.reply_text("No file found in the message.")
-        return
-
-    # If the uploaded file is a ZIP, extract it and delete the archive
-    if saved_path.suffix.lower() == ".zip":
+    # The folder normally exists since /newcase; only check once per process
+    if case_id not in _known_cases:
+        case_path.mkdir(parents=True, exist_ok=True)
+        _remember_case_dir(case_id)
+
+    # Writing into the case folder must not overlap an analysis of the same
+    # case. The lock is taken before the first await: updates are handled
+    # concurrently, so only the code up to a handler's first await runs in
+    # arrival order, and an /analyze sent right after an upload must see it.
+    async with _case_lock(case_id):
+        await update.message.chat.send_action(ChatAction.UPLOAD_DOCUMENT)
+
+        saved_path: Optional[Path] = None
+        if update.message.document:
+            saved_path = await _save_document(update, context, case_path)
+        elif update.message.photo:
+            saved_path = await _save_photo(update, context, case_path)
+
+        if not saved_path:
+            await update.message.reply_text("No file found in the message.")
+            return
+
+        # If the uploaded file is an archive, extract it and delete the archive
+        if _archive_kind(saved_path) is not None:
+            try:
+                # Extraction blocks on disk I/O and decompression; run it off
+                # the event loop so concurrently handled updates keep moving
+                count = await asyncio.to_thread(_safe_extract_archive, saved_path, case_path)
+                saved_path.unlink(missing_ok=True)
+                logger.info("Extracted %d files from %s", count, saved_path.name)
+                await update.message.reply_text(f"Archive extracted: {count} files added to case {case_id}.")
+            except Exception as e:
+                logger.exception("Failed to extract archive: %s", e)
+                await update.message.reply_text("Failed to extract archive.")
+        else:
+            await update.message.reply_text(f"Saved file to case {case_id}: {saved_path.name}")
+
+
+async def _keep_typing(chat: Chat, interval: float = 4) -> None:
+    """Show the 'typing...' indicator until cancelled.
+
+    Telegram clears a chat action after about 5 seconds, so it is re-sent every
+    'interval' seconds for as long as a long-running task is in progress.
+    Failures to send it are ignored; the indicator is cosmetic.
+    """
+    while True:
         try:
-            count = _safe_extract_zip(saved_path, case_path)
-            saved_path.unlink(missing_ok=True)
-            logger.info("Extracted %d files from %s", count, saved_path.name)
-            await update.message.reply_text(f"Zip extracted: {count} files added to case {case_id}.")
+            await chat.send_action(ChatAction.TYPING)
         except Exception as e:
-            logger.exception("Failed to extract ZIP: %s", e)
-            await update.message.reply_text("Failed to extract ZIP archive.")
-    else:
-        await update.message.reply_text(f"Saved file to case {case_id}: {saved_path.name}")
+            logger.debug("Failed to send typing action: %s", e)
+        await asyncio.sleep(interval)
 
 
 async def analyze(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /analyze: run the analysis pipeline and send back a Markdown report.
 
-    The pipeline: hashing -> metadata -> logs -> browser -> timeline -> report.
+    The pipeline: walk -> hashing -> metadata -> logs -> browser -> timeline -> report.
     """
-    case_id = context.user_data.get("case_id")
+    case_id = _get_case(update.effective_user.id)
     if not case_id:
         await update.message.reply_text("Create a case first with /newcase.")
         return
@@ -211,56 +760,100 @@ async def analyze(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         return
 
     logger.info("Starting analysis for case %s", case_id)
-    await update.message.chat.send_action(ChatAction.TYPING)
+    typing_task = asyncio.create_task(_keep_typing(update.message.chat))
 
-    try:
-        # Hashing
-        hashes = compute_hashes_for_case(case_path)
-
-        # Metadata extraction
-        metadata = extract_metadata_for_case(case_path)
-
-        # Logs parsing
-        log_events = parse_logs_for_case(case_path)
-
-        # Browser history parsing
-        browser_events = parse_browser_history(case_path)
-
-        # Timeline build
-        events = log_events + browser_events
-        timeline = build_timeline(events)
-
-        # Report generation
-        report_path = write_report(
-            case_id=case_id,
-            case_path=case_path,
-            hashes=hashes,
-            metadata=metadata,
-            timeline=timeline,
-            reports_dir=REPORTS_DIR,
-        )
-
-        # Send report back to the user
-        await update.message.reply_document(document=report_path.open("rb"), caption="DFIR Report")
-        logger.info("Analysis complete for case %s; report at %s", case_id, report_path)
-    except Exception as e:
-        logger.exception("Analysis failed: %s", e)
-        await update.message.reply_text("Analysis failed due to an internal error.")
+    # Uploads into this case wait until the analysis has finished with its
+    # files. No await comes before the lock, so an upload sent earlier
+    # already holds it and is finished first.
+    async with _case_lock(case_id):
+        try:
+            # Every stage is blocking file I/O or CPU work, so each one runs in a
+            # worker thread; the event loop stays free for other updates, which
+            # are handled concurrently.
+
+            # Walk the evidence tree once; every stage reuses the same file list
+            files = await asyncio.to_thread(walk_case, case_path)
+
+            # Hashing, metadata extraction, log parsing and browser history parsing
+            # are independent of one another, so they run concurrently; hashlib,
+            # zlib, sqlite3 and file reads release the GIL for most of their work.
+            # Every stage is awaited even if one fails, so no worker thread is
+            # still reading the case once the lock is released.
+            results = await asyncio.gather(
+                asyncio.to_thread(
+                    compute_hashes_for_case,
+                    case_path,
+                    files,
+                    hash_algorithms=context.bot_data["hash_algorithms"],
+                    cache_path=HASH_CACHE_PATH,
+                ),
+                asyncio.to_thread(extract_metadata_for_case, case_path, files),
+                asyncio.to_thread(parse_logs_for_case, case_path, files),
+                asyncio.to_thread(parse_browser_history, case_path, files),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            hashes, metadata, log_events, browser_events = results
+
+            # Timeline build
+            events = log_events + browser_events
+            timeline = await asyncio.to_thread(build_timeline, events)
+
+            # Report generation
+            report_path = await asyncio.to_thread(
+                write_report,
+                case_id=case_id,
+                case_path=case_path,
+                hashes=hashes,
+                metadata=metadata,
+                timeline=timeline,
+                reports_dir=REPORTS_DIR,
+                hash_algorithms=context.bot_data["hash_algorithms"],
+            )
+
+            # Stop the indicator first so it cannot reappear after the report
+            typing_task.cancel()
+
+            # Send report back to the user. With read_file_handle=False PTB hands
+            # the open file to httpx, which reads it in small chunks while
+            # uploading, so memory use does not grow with the report size.
+            with await asyncio.to_thread(report_path.open, "rb") as report:
+                await update.message.reply_document(
+                    document=InputFile(report, filename=report_path.name, read_file_handle=False),
+                    caption="DFIR Report",
+                )
+            logger.info("Analysis complete for case %s; report at %s", case_id, report_path)
+        except Exception as e:
+            logger.exception("Analysis failed: %s", e)
+            await update.message.reply_text("Analysis failed due to an internal error.")
+        finally:
+            typing_task.cancel()
 
 
 def main() -> None:
     """Entrypoint: load token, ensure dirs, and start the bot application.
 
-    This wires commands and message handlers, then uses polling to receive updates.
+    This wires commands and message handlers, then receives updates through a
+    webhook when WEBHOOK_URL is set (Telegram pushes each update as it
+    happens), or by long polling otherwise.
     """
     load_dotenv()
     token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not token:
         raise RuntimeError("TELEGRAM_BOT_TOKEN is not set in .env")
 
+    hash_algorithms = _hash_algorithms()
     _ensure_dirs()
 
-    app = ApplicationBuilder().token(token).build()
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    # Without concurrent_updates PTB handles one update at a time, so a long
+    # upload or analysis would hold up every other chat until it returned
+    app = ApplicationBuilder().token(token).concurrent_updates(_MAX_CONCURRENT_UPDATES).build()
+    app.bot_data["hash_algorithms"] = hash_algorithms
 
     # Command handlers
     app.add_handler(CommandHandler("start", start))
@@ -270,8 +863,23 @@ def main() -> None:
     # Upload handlers: documents and photos
     app.add_handler(MessageHandler(filters.Document.ALL | filters.PHOTO, handle_upload))
 
-    logger.info("Bot starting...")
-    app.run_polling()
+    webhook_url = os.getenv("WEBHOOK_URL")
+    if webhook_url:
+        # The bot listens on PORT; WEBHOOK_URL is the public HTTPS base URL
+        # (e.g., behind a reverse proxy) that Telegram posts updates to. The
+        # token as URL path keeps the endpoint unguessable; WEBHOOK_SECRET, if
+        # set, is also checked on every request Telegram makes.
+        logger.info("Bot starting (webhook)...")
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=int(os.getenv("PORT", "8443")),
+            url_path=token,
+            webhook_url=f"{webhook_url.rstrip('/')}/{token}",
+            secret_token=os.getenv("WEBHOOK_SECRET") or None,
+        )
+    else:
+        logger.info("Bot starting (polling)...")
+        app.run_polling()
 
 
 if __name__ == "__main__":